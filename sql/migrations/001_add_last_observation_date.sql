@@ -0,0 +1,14 @@
+-- ============================================
+-- MIGRATION 001: series_metadata.last_observation_date
+-- Author: Osvaldo Ruiz
+-- Description: Adds the column the incremental ETL uses to skip
+--              series FRED hasn't updated. Run once against databases
+--              created from the pre-incremental schema; fresh installs
+--              from schema.sql already include it.
+-- Usage: psql -d economic_indicators -f sql/migrations/001_add_last_observation_date.sql
+-- ============================================
+
+ALTER TABLE series_metadata
+    ADD COLUMN IF NOT EXISTS last_observation_date DATE;
+
+SELECT 'Migration 001 applied' as status;
@@ -22,6 +22,8 @@ CREATE TABLE series_metadata (
     units VARCHAR(100),
     seasonal_adjustment VARCHAR(50),
     category VARCHAR(100),
+    -- Existing databases: apply sql/migrations/001_add_last_observation_date.sql
+    last_observation_date DATE,
     last_updated TIMESTAMP DEFAULT CURRENT_TIMESTAMP
 );
 
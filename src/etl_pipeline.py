@@ -12,18 +12,88 @@ Usage:
 
 import os
 import sys
+import asyncio
+import threading
+import aiohttp
 import pandas as pd
 import numpy as np
-from fredapi import Fred
+import psycopg2.extras
+from numba import njit
+from scipy.stats import rankdata
 from sqlalchemy import create_engine, text
-from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import datetime, timedelta
 from dotenv import load_dotenv
 import warnings
-import time
 
 warnings.filterwarnings('ignore')
 load_dotenv()
 
+FRED_API_BASE = 'https://api.stlouisfed.org/fred'
+
+# FRED allows 120 requests/minute - stay well under it
+MAX_CONCURRENT_REQUESTS = 5
+
+# Parallel transform/load workers - bounded by Postgres write concurrency
+MAX_LOAD_WORKERS = 4
+
+# Series metadata (title, units, frequency) changes on FRED maybe once a
+# year - re-fetch it only after this many days
+METADATA_MAX_AGE_DAYS = 30
+
+
+@njit(cache=True, error_model='numpy')
+def _compute_metrics(v: np.ndarray, yoy_lag: int) -> tuple:
+    """
+    Compute all per-element derived metrics in one fused pass
+
+    One forward loop produces the mom/yoy percent changes, the 3- and
+    12-observation rolling means (sliding-sum accumulators, matching
+    min_periods=1 semantics) and the running totals for the z-score,
+    so the values array is streamed through once instead of six times.
+
+    error_model='numpy' keeps division by a zero observation producing
+    inf/nan (absorbed by the isfinite mask in transform_data) instead of
+    raising ZeroDivisionError.
+    """
+    n = v.shape[0]
+    mom = np.full(n, np.nan)
+    yoy = np.full(n, np.nan)
+    r3 = np.empty(n)
+    r12 = np.empty(n)
+    z = np.zeros(n)
+
+    total = 0.0
+    total_sq = 0.0
+    sum3 = 0.0
+    sum12 = 0.0
+
+    for i in range(n):
+        x = v[i]
+        total += x
+        total_sq += x * x
+        sum3 += x
+        sum12 += x
+        if i >= 3:
+            sum3 -= v[i - 3]
+        if i >= 12:
+            sum12 -= v[i - 12]
+        r3[i] = sum3 / min(i + 1, 3)
+        r12[i] = sum12 / min(i + 1, 12)
+        if i >= 1:
+            mom[i] = (x - v[i - 1]) / v[i - 1] * 100
+        if i >= yoy_lag:
+            yoy[i] = (x - v[i - yoy_lag]) / v[i - yoy_lag] * 100
+
+    mean = total / n
+    variance = total_sq / n - mean * mean
+    if variance > 0:
+        std = np.sqrt(variance)
+        for i in range(n):
+            z[i] = (v[i] - mean) / std
+
+    return mom, yoy, r3, r12, z
+
 
 class FredETLPipeline:
     """
@@ -42,8 +112,13 @@ class FredETLPipeline:
         if not os.getenv('DATABASE_URL'):
             raise ValueError("DATABASE_URL not found in environment variables")
         
-        self.fred = Fred(api_key=os.getenv('FRED_API_KEY'))
-        self.engine = create_engine(os.getenv('DATABASE_URL'))
+        self.fred_api_key = os.getenv('FRED_API_KEY')
+        self.engine = create_engine(
+            os.getenv('DATABASE_URL'),
+            pool_size=8,
+            max_overflow=4
+        )
+        self._print_lock = threading.Lock()
         
         # Economic indicators to track with categories
         self.indicators = {
@@ -117,45 +192,160 @@ class FredETLPipeline:
         print(f"Database: {os.getenv('DATABASE_URL').split('@')[1]}")
         print("=" * 60)
     
-    def extract_series(self, series_id: str, start_date: str = '2000-01-01') -> tuple:
+    async def _fetch_json(self, session: aiohttp.ClientSession, endpoint: str, params: dict) -> dict:
+        """Issue a single GET against the FRED REST API and return parsed JSON"""
+
+        url = f"{FRED_API_BASE}/{endpoint}"
+        query = {'api_key': self.fred_api_key, 'file_type': 'json', **params}
+
+        async with session.get(url, params=query) as response:
+            response.raise_for_status()
+            return await response.json()
+
+    async def _fetch_series(self, session: aiohttp.ClientSession, semaphore: asyncio.Semaphore,
+                            series_id: str, last_known_date=None, cached_info: dict = None,
+                            start_date: str = '2000-01-01') -> tuple:
         """
-        Extract single series from FRED API
-        
+        Extract single series from FRED API (observations + metadata in parallel)
+
+        If the series already has data in the database, a cheap probe of
+        the recent revision window runs first; when FRED has nothing newer
+        than what we stored, the full download is skipped entirely.
+
         Args:
+            session: Shared aiohttp session (HTTP keep-alive)
+            semaphore: Concurrency limiter for API rate limiting
             series_id: FRED series identifier
+            last_known_date: Newest observation date already in the database
+            cached_info: Recently stored series metadata; when given, the
+                metadata endpoint isn't queried at all
             start_date: Start date for historical data
-            
+
         Returns:
-            Tuple of (DataFrame, series_info dict)
+            Tuple of (series_id, DataFrame, series_info dict).
+            An empty DataFrame means the series is already up to date.
         """
         try:
-            # Get series data
-            data = self.fred.get_series(
-                series_id, 
-                observation_start=start_date
-            )
-            
-            # Get series metadata
-            info = self.fred.get_series_info(series_id)
-            
-            # Create DataFrame
-            df = pd.DataFrame({
-                'observation_date': data.index,
-                'value': data.values,
-                'series_id': series_id
-            })
-            
-            # Clean data
+            async with semaphore:
+                if last_known_date is not None:
+                    # Probe the last ~month of observations (35-day buffer
+                    # covers FRED revisions) before committing to a full pull
+                    probe_start = (pd.Timestamp(last_known_date)
+                                   - pd.Timedelta(days=35)).strftime('%Y-%m-%d')
+                    probe_json = await self._fetch_json(session, 'series/observations', {
+                        'series_id': series_id,
+                        'observation_start': probe_start
+                    })
+                    probe_dates = [obs['date'] for obs in probe_json['observations']
+                                   if obs['value'] != '.']
+                    if not probe_dates or max(probe_dates) <= str(last_known_date):
+                        print(f"  - {series_id}: no new observations since {last_known_date}")
+                        return series_id, pd.DataFrame(), None
+
+                if cached_info is not None:
+                    obs_json = await self._fetch_json(session, 'series/observations', {
+                        'series_id': series_id,
+                        'observation_start': start_date
+                    })
+                    info = cached_info
+                else:
+                    obs_json, info_json = await asyncio.gather(
+                        self._fetch_json(session, 'series/observations', {
+                            'series_id': series_id,
+                            'observation_start': start_date
+                        }),
+                        self._fetch_json(session, 'series', {'series_id': series_id})
+                    )
+                    info = info_json['seriess'][0]
+                # Rate limiting - be nice to the API
+                await asyncio.sleep(0.5)
+
+            # Create DataFrame directly from the JSON payload
+            df = pd.DataFrame(obs_json['observations'])[['date', 'value']]
+            df = df.rename(columns={'date': 'observation_date'})
+            df['series_id'] = series_id
+
+            # Clean data (FRED encodes missing values as '.')
             df['observation_date'] = pd.to_datetime(df['observation_date'])
             df['value'] = pd.to_numeric(df['value'], errors='coerce')
             df = df.dropna(subset=['value'])
-            
-            print(f"  ✓ Extracted {len(df)} observations")
-            return df, info
-            
+
+            print(f"  ✓ {series_id}: extracted {len(df)} observations")
+            return series_id, df, info
+
         except Exception as e:
-            print(f"  ✗ Error: {e}")
-            return None, None
+            print(f"  ✗ {series_id}: {e}")
+            return series_id, None, None
+
+    async def extract_all(self, last_observation_dates: dict = None,
+                          cached_series_info: dict = None) -> dict:
+        """
+        Extract all indicators concurrently
+
+        Args:
+            last_observation_dates: series_id -> newest stored observation
+                date, used to skip series with no new data
+            cached_series_info: series_id -> recently stored metadata dict,
+                used to skip the metadata endpoint
+
+        Returns:
+            Dict mapping series_id -> (DataFrame, series_info dict)
+        """
+        last_observation_dates = last_observation_dates or {}
+        cached_series_info = cached_series_info or {}
+        semaphore = asyncio.Semaphore(MAX_CONCURRENT_REQUESTS)
+
+        async with aiohttp.ClientSession() as session:
+            results = await asyncio.gather(*[
+                self._fetch_series(session, semaphore, series_id,
+                                   last_observation_dates.get(series_id),
+                                   cached_series_info.get(series_id))
+                for series_id in self.indicators
+            ])
+
+        return {series_id: (df, info) for series_id, df, info in results}
+
+    def _get_last_observation_dates(self) -> dict:
+        """Read each series' newest stored observation date from metadata"""
+
+        try:
+            with self.engine.connect() as conn:
+                result = conn.execute(text(
+                    "SELECT series_id, last_observation_date FROM series_metadata"
+                ))
+                return {row[0]: row[1] for row in result if row[1] is not None}
+        except Exception:
+            # First run - schema may not have data yet
+            return {}
+
+    def _get_cached_series_info(self) -> dict:
+        """
+        Read recently refreshed series metadata from the database
+
+        Returns info dicts (same keys as the FRED series endpoint) for
+        series whose metadata was fetched within METADATA_MAX_AGE_DAYS,
+        so extraction can skip the metadata API call for them.
+        """
+        cutoff = datetime.now() - timedelta(days=METADATA_MAX_AGE_DAYS)
+        try:
+            with self.engine.connect() as conn:
+                result = conn.execute(text("""
+                    SELECT series_id, frequency, units, seasonal_adjustment, last_updated
+                    FROM series_metadata
+                """))
+                return {
+                    row[0]: {
+                        'frequency_short': row[1],
+                        'units': row[2],
+                        'seasonal_adjustment_short': row[3],
+                        '_metadata_fetched_at': row[4],
+                    }
+                    for row in result
+                    if row[4] is not None and row[4] >= cutoff
+                }
+        except Exception:
+            # First run - schema may not have data yet
+            return {}
     
     def transform_data(self, df: pd.DataFrame) -> pd.DataFrame:
         """
@@ -172,140 +362,148 @@ class FredETLPipeline:
             return None
         
         df = df.sort_values('observation_date').copy()
-        
-        # Month-over-month percent change
-        df['mom_change'] = df['value'].pct_change() * 100
-        
-        # Year-over-year percent change
-        # Handle different frequencies (monthly vs quarterly)
-        if len(df) > 12:
-            df['yoy_change'] = df['value'].pct_change(periods=12) * 100
-        else:
-            df['yoy_change'] = df['value'].pct_change(periods=4) * 100
-        
-        # Rolling averages
-        df['rolling_avg_3m'] = df['value'].rolling(window=3, min_periods=1).mean()
-        df['rolling_avg_12m'] = df['value'].rolling(window=12, min_periods=1).mean()
-        
-        # Z-score (how unusual is current value vs history)
-        mean_val = df['value'].mean()
-        std_val = df['value'].std()
-        if std_val > 0:
-            df['z_score'] = (df['value'] - mean_val) / std_val
-        else:
-            df['z_score'] = 0
-        
-        # Percentile rank
-        df['percentile_rank'] = df['value'].rank(pct=True) * 100
-        
-        # IMPORTANT: Replace infinite values with None (NULL in database)
-        import numpy as np
-        df = df.replace([np.inf, -np.inf], np.nan)
+        v = df['value'].to_numpy(dtype=np.float64)
+
+        # Year-over-year lag depends on frequency (monthly vs quarterly)
+        yoy_lag = 12 if len(df) > 12 else 4
+
+        # One fused Numba pass computes percent changes, rolling averages
+        # and z-scores together
+        mom, yoy, r3, r12, z = _compute_metrics(v, yoy_lag)
+        df['mom_change'] = mom
+        df['yoy_change'] = yoy
+        df['rolling_avg_3m'] = r3
+        df['rolling_avg_12m'] = r12
+        df['z_score'] = z
+
+        # Percentile rank (rank-based - needs a sort, so it stays outside
+        # the streaming kernel)
+        df['percentile_rank'] = rankdata(v, method='average') / len(v) * 100
+
+        # IMPORTANT: Replace infinite values with NaN (NULL in database).
+        # Only the computed columns can contain infinities, so mask just
+        # those instead of copying the whole frame with replace()
+        computed_cols = ['mom_change', 'yoy_change', 'rolling_avg_3m',
+                         'rolling_avg_12m', 'z_score']
+        computed = df[computed_cols].to_numpy(dtype=np.float64)
+        computed[~np.isfinite(computed)] = np.nan
+        df[computed_cols] = computed
         
         print(f"  ✓ Calculated 6 derived metrics")
         return df
     
-    def load_metadata(self, series_id: str, info: dict, category: str):
-        """Load series metadata to database"""
-        
-        with self.engine.connect() as conn:
-            conn.execute(text("""
-                INSERT INTO series_metadata 
-                    (series_id, title, frequency, units, seasonal_adjustment, category, last_updated)
-                VALUES 
-                    (:series_id, :title, :frequency, :units, :seasonal_adj, :category, :last_updated)
+    def load_metadata(self, conn, series_id: str, info: dict, category: str,
+                      last_observation_date=None):
+        """Load series metadata using the caller's connection"""
+
+        with conn.cursor() as cur:
+            cur.execute("""
+                INSERT INTO series_metadata
+                    (series_id, title, frequency, units, seasonal_adjustment, category,
+                     last_observation_date, last_updated)
+                VALUES
+                    (%(series_id)s, %(title)s, %(frequency)s, %(units)s, %(seasonal_adj)s,
+                     %(category)s, %(last_observation_date)s, %(last_updated)s)
                 ON CONFLICT (series_id) DO UPDATE SET
                     title = EXCLUDED.title,
                     frequency = EXCLUDED.frequency,
                     units = EXCLUDED.units,
                     seasonal_adjustment = EXCLUDED.seasonal_adjustment,
                     category = EXCLUDED.category,
+                    last_observation_date = EXCLUDED.last_observation_date,
                     last_updated = EXCLUDED.last_updated
-            """), {
+            """, {
                 'series_id': series_id,
                 'title': self.indicators[series_id]['title'],
                 'frequency': info.get('frequency_short', 'M'),
                 'units': info.get('units', ''),
                 'seasonal_adj': info.get('seasonal_adjustment_short', ''),
                 'category': category,
-                'last_updated': datetime.now()
+                'last_observation_date': last_observation_date,
+                # Cached info keeps its original fetch time so the
+                # metadata cache still expires after METADATA_MAX_AGE_DAYS
+                'last_updated': info.get('_metadata_fetched_at') or datetime.now()
             })
-            conn.commit()
     
-    def load_observations(self, df: pd.DataFrame):
-        """Load raw observations to database"""
-        
+    def load_observations(self, conn, df: pd.DataFrame):
+        """Load raw observations using the caller's connection"""
+
         observations_df = df[['series_id', 'observation_date', 'value']].copy()
-        
-        # Use upsert logic
-        with self.engine.connect() as conn:
-            for _, row in observations_df.iterrows():
-                conn.execute(text("""
-                    INSERT INTO observations (series_id, observation_date, value)
-                    VALUES (:series_id, :observation_date, :value)
-                    ON CONFLICT (series_id, observation_date) DO UPDATE SET
-                        value = EXCLUDED.value
-                """), {
-                    'series_id': row['series_id'],
-                    'observation_date': row['observation_date'],
-                    'value': row['value']
-                })
-            conn.commit()
-    
-    def load_metrics(self, df: pd.DataFrame):
-        """Load calculated metrics to database"""
-        
-        metrics_cols = ['series_id', 'observation_date', 'value', 'mom_change', 
-                        'yoy_change', 'rolling_avg_3m', 'rolling_avg_12m', 
+
+        # Bulk upsert - one multi-row INSERT instead of a round-trip per row
+        rows = list(observations_df.itertuples(index=False, name=None))
+
+        with conn.cursor() as cur:
+            psycopg2.extras.execute_values(cur, """
+                INSERT INTO observations (series_id, observation_date, value)
+                VALUES %s
+                ON CONFLICT (series_id, observation_date) DO UPDATE SET
+                    value = EXCLUDED.value
+            """, rows, page_size=1000)
+
+    def load_metrics(self, conn, df: pd.DataFrame):
+        """Load calculated metrics using the caller's connection"""
+
+        metrics_cols = ['series_id', 'observation_date', 'value', 'mom_change',
+                        'yoy_change', 'rolling_avg_3m', 'rolling_avg_12m',
                         'z_score', 'percentile_rank']
-        
-        metrics_df = df[metrics_cols].copy()
-        
-        # Use upsert logic
-        with self.engine.connect() as conn:
-            for _, row in metrics_df.iterrows():
-                conn.execute(text("""
-                    INSERT INTO calculated_metrics 
-                        (series_id, observation_date, value, mom_change, yoy_change,
-                         rolling_avg_3m, rolling_avg_12m, z_score, percentile_rank)
-                    VALUES 
-                        (:series_id, :observation_date, :value, :mom_change, :yoy_change,
-                         :rolling_avg_3m, :rolling_avg_12m, :z_score, :percentile_rank)
-                    ON CONFLICT (series_id, observation_date) DO UPDATE SET
-                        value = EXCLUDED.value,
-                        mom_change = EXCLUDED.mom_change,
-                        yoy_change = EXCLUDED.yoy_change,
-                        rolling_avg_3m = EXCLUDED.rolling_avg_3m,
-                        rolling_avg_12m = EXCLUDED.rolling_avg_12m,
-                        z_score = EXCLUDED.z_score,
-                        percentile_rank = EXCLUDED.percentile_rank
-                """), row.to_dict())
-            conn.commit()
+
+        metrics_df = df[metrics_cols]
+
+        # One vectorized pass builds the parameter rows: object dtype with
+        # NaN -> None so gaps in the computed metrics load as SQL NULLs
+        metrics_df = metrics_df.astype(object).where(metrics_df.notna(), None)
+        rows = list(metrics_df.itertuples(index=False, name=None))
+
+        with conn.cursor() as cur:
+            psycopg2.extras.execute_values(cur, """
+                INSERT INTO calculated_metrics
+                    (series_id, observation_date, value, mom_change, yoy_change,
+                     rolling_avg_3m, rolling_avg_12m, z_score, percentile_rank)
+                VALUES %s
+                ON CONFLICT (series_id, observation_date) DO UPDATE SET
+                    value = EXCLUDED.value,
+                    mom_change = EXCLUDED.mom_change,
+                    yoy_change = EXCLUDED.yoy_change,
+                    rolling_avg_3m = EXCLUDED.rolling_avg_3m,
+                    rolling_avg_12m = EXCLUDED.rolling_avg_12m,
+                    z_score = EXCLUDED.z_score,
+                    percentile_rank = EXCLUDED.percentile_rank
+            """, rows, page_size=1000)
     
-    def process_series(self, series_id: str):
-        """Process a single series through full ETL"""
-        
+    def process_series(self, series_id: str, df: pd.DataFrame, info: dict):
+        """Transform and load a single extracted series"""
+
         indicator_info = self.indicators[series_id]
-        print(f"\n📊 {indicator_info['title']} ({series_id})")
-        print("-" * 40)
-        
-        # Extract
-        df, info = self.extract_series(series_id)
+        with self._print_lock:
+            print(f"\n📊 {indicator_info['title']} ({series_id})")
+            print("-" * 40)
+
         if df is None:
             return False
-        
+
         # Transform
         df_transformed = self.transform_data(df)
         if df_transformed is None:
             return False
-        
-        # Load
+
+        # Load - one connection and one transaction for the whole series
         print("  Loading to database...")
-        self.load_metadata(series_id, info, indicator_info['category'])
-        self.load_observations(df_transformed)
-        self.load_metrics(df_transformed)
+        conn = self.engine.raw_connection()
+        try:
+            with conn.cursor() as cur:
+                # Skip the WAL flush wait for this transaction only -
+                # an ETL re-run can always replay a lost batch
+                cur.execute("SET LOCAL synchronous_commit = OFF")
+            self.load_metadata(conn, series_id, info, indicator_info['category'],
+                               df_transformed['observation_date'].max())
+            self.load_observations(conn, df_transformed)
+            self.load_metrics(conn, df_transformed)
+            conn.commit()
+        finally:
+            conn.close()
         print(f"  ✓ Loaded {len(df_transformed)} records")
-        
+
         return True
     
     def run_full_pipeline(self):
@@ -318,22 +516,41 @@ class FredETLPipeline:
         print(f"Timestamp: {start_time.strftime('%Y-%m-%d %H:%M:%S')}")
         print("=" * 60)
         
+        # Extract all series concurrently (I/O-bound on network latency),
+        # skipping any series FRED hasn't updated since our last run
+        print(f"\n🌐 Extracting {len(self.indicators)} series from FRED...")
+        last_observation_dates = self._get_last_observation_dates()
+        cached_series_info = self._get_cached_series_info()
+        extracted = asyncio.run(self.extract_all(last_observation_dates,
+                                                 cached_series_info))
+
         success_count = 0
         fail_count = 0
-        
-        for series_id in self.indicators.keys():
-            try:
-                if self.process_series(series_id):
-                    success_count += 1
-                else:
+
+        up_to_date = [series_id for series_id, (df, _) in extracted.items()
+                      if df is not None and df.empty]
+        skip_count = len(up_to_date)
+
+        # Transform/load each series in parallel - load is I/O-bound on
+        # Postgres round-trips and transform is independent per series
+        with ThreadPoolExecutor(max_workers=MAX_LOAD_WORKERS) as executor:
+            futures = {
+                executor.submit(self.process_series, series_id, *extracted[series_id]): series_id
+                for series_id in self.indicators.keys()
+                if series_id not in up_to_date
+            }
+
+            for future in as_completed(futures):
+                series_id = futures[future]
+                try:
+                    if future.result():
+                        success_count += 1
+                    else:
+                        fail_count += 1
+
+                except Exception as e:
+                    print(f"  ✗ {series_id} failed: {e}")
                     fail_count += 1
-                    
-                # Rate limiting - be nice to the API
-                time.sleep(0.5)
-                
-            except Exception as e:
-                print(f"  ✗ Failed: {e}")
-                fail_count += 1
         
         end_time = datetime.now()
         duration = (end_time - start_time).seconds
@@ -342,6 +559,7 @@ class FredETLPipeline:
         print("ETL PIPELINE COMPLETE")
         print("=" * 60)
         print(f"✓ Successful: {success_count}/{len(self.indicators)}")
+        print(f"- Already up to date: {skip_count}/{len(self.indicators)}")
         print(f"✗ Failed: {fail_count}/{len(self.indicators)}")
         print(f"⏱ Duration: {duration} seconds")
         print("=" * 60)
@@ -350,22 +568,28 @@ class FredETLPipeline:
     
     def export_for_dashboard(self, output_path: str = 'data/dashboard_export.csv'):
         """Export pivoted data for Tableau/Google Sheets"""
-        
+
         print(f"\n📤 Exporting data for dashboard...")
-        
+
         query = """
         SELECT * FROM economic_dashboard_view
         WHERE observation_date >= '2010-01-01'
         ORDER BY observation_date
         """
-        
-        df = pd.read_sql(query, self.engine)
-        
+
         os.makedirs(os.path.dirname(output_path), exist_ok=True)
-        df.to_csv(output_path, index=False)
-        
-        print(f"✓ Exported {len(df)} rows to {output_path}")
-        return df
+
+        # Stream from a server-side cursor straight into the CSV so memory
+        # stays constant as the history grows
+        row_count = 0
+        with self.engine.connect().execution_options(stream_results=True) as conn:
+            with open(output_path, 'w') as f:
+                for chunk in pd.read_sql(query, conn, chunksize=50_000):
+                    chunk.to_csv(f, index=False, header=(row_count == 0))
+                    row_count += len(chunk)
+
+        print(f"✓ Exported {row_count} rows to {output_path}")
+        return row_count
     
     def export_current_snapshot(self, output_path: str = 'data/current_snapshot.csv'):
         """Export current values for KPI cards"""
@@ -20,6 +20,20 @@ SCOPES = [
     'https://www.googleapis.com/auth/drive'
 ]
 
+# Rows per write - large enough to amortize per-request overhead, small
+# enough to stay under Google's per-request payload cap as history grows
+SHEETS_CHUNK_ROWS = 5000
+
+
+def _chunked_update(worksheet, header, rows, chunk_size=SHEETS_CHUNK_ROWS):
+    """Write header + rows to a worksheet in payload-sized batches"""
+
+    # range_name is required positionally in gspread 5.x; the named form
+    # works on both 5.x and 6.x
+    worksheet.update(range_name='A1', values=[header], value_input_option='RAW')
+    for i in range(0, len(rows), chunk_size):
+        worksheet.append_rows(rows[i:i + chunk_size], value_input_option='RAW')
+
 
 def get_sheets_client():
     """Authenticate with Google Sheets API using service account"""
@@ -49,60 +63,45 @@ def export_dashboard_data():
     print("\n📊 Connecting to database...")
     engine = get_database_connection()
     
-    # Query dashboard data
+    # Query dashboard data - flat monthly aggregates only, pivot happens
+    # client-side so Postgres skips the CASE-pivot and window-function plan
     print("📥 Fetching dashboard data...")
     dashboard_query = """
-        WITH monthly_data AS (
-            SELECT 
-                DATE_TRUNC('month', cm.observation_date)::date AS month_date,
-                cm.series_id,
-                AVG(cm.value) AS value,
-                AVG(cm.yoy_change) AS yoy_change
-            FROM calculated_metrics cm
-            WHERE cm.observation_date >= '2015-01-01'
-            GROUP BY DATE_TRUNC('month', cm.observation_date), cm.series_id
-        ),
-        pivoted AS (
-            SELECT 
-                month_date AS observation_date,
-                MAX(CASE WHEN series_id = 'GDP' THEN yoy_change END) AS gdp_growth_yoy,
-                MAX(CASE WHEN series_id = 'UNRATE' THEN value END) AS unemployment_rate,
-                MAX(CASE WHEN series_id = 'CPIAUCSL' THEN yoy_change END) AS inflation_yoy,
-                MAX(CASE WHEN series_id = 'FEDFUNDS' THEN value END) AS fed_funds_rate,
-                MAX(CASE WHEN series_id = 'UMCSENT' THEN value END) AS consumer_sentiment,
-                MAX(CASE WHEN series_id = 'HOUST' THEN value END) AS housing_starts,
-                MAX(CASE WHEN series_id = 'RSXFS' THEN yoy_change END) AS retail_sales_yoy,
-                MAX(CASE WHEN series_id = 'INDPRO' THEN yoy_change END) AS industrial_prod_yoy,
-                MAX(CASE WHEN series_id = 'T10Y2Y' THEN value END) AS yield_curve_spread,
-                MAX(CASE WHEN series_id = 'ICSA' THEN value END) AS jobless_claims
-            FROM monthly_data
-            GROUP BY month_date
-        ),
-        filled AS (
-            SELECT 
-                observation_date,
-                COALESCE(
-                    gdp_growth_yoy,
-                    LAG(gdp_growth_yoy, 1) OVER (ORDER BY observation_date),
-                    LAG(gdp_growth_yoy, 2) OVER (ORDER BY observation_date),
-                    LAG(gdp_growth_yoy, 3) OVER (ORDER BY observation_date)
-                ) AS gdp_growth_yoy,
-                unemployment_rate,
-                inflation_yoy,
-                fed_funds_rate,
-                consumer_sentiment,
-                housing_starts,
-                retail_sales_yoy,
-                industrial_prod_yoy,
-                yield_curve_spread,
-                jobless_claims
-            FROM pivoted
-        )
-        SELECT * FROM filled
-        WHERE unemployment_rate IS NOT NULL
-        ORDER BY observation_date
+        SELECT
+            DATE_TRUNC('month', observation_date)::date AS observation_date,
+            series_id,
+            AVG(value) AS value,
+            AVG(yoy_change) AS yoy_change
+        FROM calculated_metrics
+        WHERE observation_date >= '2015-01-01'
+        GROUP BY 1, 2
     """
-    dashboard_df = pd.read_sql(dashboard_query, engine)
+    flat_df = pd.read_sql(dashboard_query, engine)
+
+    # Pivot to one column per dashboard metric
+    value_wide = flat_df.pivot_table(
+        index='observation_date', columns='series_id', values='value')
+    yoy_wide = flat_df.pivot_table(
+        index='observation_date', columns='series_id', values='yoy_change')
+
+    dashboard_df = pd.DataFrame({
+        'gdp_growth_yoy': yoy_wide.get('GDP'),
+        'unemployment_rate': value_wide.get('UNRATE'),
+        'inflation_yoy': yoy_wide.get('CPIAUCSL'),
+        'fed_funds_rate': value_wide.get('FEDFUNDS'),
+        'consumer_sentiment': value_wide.get('UMCSENT'),
+        'housing_starts': value_wide.get('HOUST'),
+        'retail_sales_yoy': yoy_wide.get('RSXFS'),
+        'industrial_prod_yoy': yoy_wide.get('INDPRO'),
+        'yield_curve_spread': value_wide.get('T10Y2Y'),
+        'jobless_claims': value_wide.get('ICSA'),
+    })
+
+    # Forward-fill quarterly GDP into the monthly grid (at most 3 months)
+    dashboard_df['gdp_growth_yoy'] = dashboard_df['gdp_growth_yoy'].ffill(limit=3)
+
+    dashboard_df = dashboard_df[dashboard_df['unemployment_rate'].notna()]
+    dashboard_df = dashboard_df.sort_index().reset_index()
     print(f"   ✓ Retrieved {len(dashboard_df)} rows of dashboard data")
     
     # Query current snapshot
@@ -128,16 +127,15 @@ def export_dashboard_data():
     except gspread.WorksheetNotFound:
         worksheet = spreadsheet.add_worksheet('Dashboard Data', rows=1000, cols=20)
     
-    # Convert dates to strings for Google Sheets
-    dashboard_df['observation_date'] = dashboard_df['observation_date'].astype(str)
-    
-    # Fill NaN with empty string
-    dashboard_df = dashboard_df.fillna('')
-    
-    # Write header and data
+    # Convert dates to strings for Google Sheets (C-level strftime)
+    dashboard_df['observation_date'] = pd.to_datetime(
+        dashboard_df['observation_date']).dt.strftime('%Y-%m-%d')
+
+    # Single object-array materialization with NaN -> '' in the same step
     header = dashboard_df.columns.tolist()
-    data = dashboard_df.values.tolist()
-    worksheet.update([header] + data)
+    data = dashboard_df.to_numpy(dtype=object, na_value='').tolist()
+
+    _chunked_update(worksheet, header, data)
     print(f"   ✓ Wrote {len(data)} rows to 'Dashboard Data'")
     
     # === Update Current Snapshot Sheet ===
@@ -149,13 +147,13 @@ def export_dashboard_data():
         snapshot_ws = spreadsheet.add_worksheet('Current Snapshot', rows=50, cols=15)
     
     # Convert dates to strings
-    snapshot_df['as_of_date'] = snapshot_df['as_of_date'].astype(str)
-    snapshot_df = snapshot_df.fillna('')
-    
+    snapshot_df['as_of_date'] = pd.to_datetime(
+        snapshot_df['as_of_date']).dt.strftime('%Y-%m-%d')
+
     # Write header and data
     header = snapshot_df.columns.tolist()
-    data = snapshot_df.values.tolist()
-    snapshot_ws.update([header] + data)
+    data = snapshot_df.to_numpy(dtype=object, na_value='').tolist()
+    _chunked_update(snapshot_ws, header, data)
     print(f"   ✓ Wrote {len(data)} rows to 'Current Snapshot'")
     
     # === Summary ===